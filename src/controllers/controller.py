@@ -79,4 +79,6 @@ class Controller:
         # # TODO: jsonify GeneratedScenario
         
         # # TODO: return JSON
-        return json.dumps(generated_scenario)
\ No newline at end of file
+        # Compact separators; the payload is machine-consumed and the
+        # default ', ' padding inflates large scenarios noticeably
+        return json.dumps(generated_scenario, separators=(',', ':'))
\ No newline at end of file
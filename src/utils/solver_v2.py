@@ -3,11 +3,62 @@ from ortools.sat.python.cp_model import IntVar
 from typing import List, Dict, Tuple, Any
 from src.models import solver_model as sm, model as m
 from datetime import timedelta, datetime
+from dataclasses import dataclass, fields
+from operator import attrgetter, itemgetter
 import collections
+import concurrent.futures
+import functools
+import json
 import os
-import re
 import uuid
 
+# Schedule constants in horizon minutes; the end of day is a time of day
+TIME_MAX_INTERVAL_MINUTES = 5
+TIME_TRANSFER_MINUTES = 5
+TIME_END_OF_DAY = timedelta(hours=18)
+
+# Solve-time knobs; parsed once at import rather than on every generate()
+SOLVER_MAX_TIME_SECONDS = int(os.getenv('SOLVER_MAX_TIME_MINUTES', 3)) * 60
+SOLVER_NUM_WORKERS = int(os.getenv('SOLVER_WORKERS', os.cpu_count() or 8))
+
+# Lower-cased anchor activity names as keyed in activities_names_map
+ACTIVITY_CHECK_IN = 'check-in, consent & change'
+ACTIVITY_FIRST_CONSULT = 'consultation and physical'
+ACTIVITY_FINAL_CONSULT = 'final consult'
+ACTIVITY_LUNCH = 'lunch'
+ACTIVITY_CHECKOUT = 'checkout'
+ACTIVITY_MRI_OPTIMAL = 'mri optimal'
+ACTIVITY_MRI_ULTIMATE = 'mri ultimate'
+
+# Field names are a class-level constant; reading them once avoids
+# touching each instance __dict__ in the activities setter
+TIME_ALLOCATION_FIELDS = tuple(field.name for field in fields(m.TimeAllocation))
+
+# Assessment ordering for the solver; unknown assessments sort last
+ASSESSMENT_PRIORITIES = {
+    m.ClientType.OPTIMAL.value: 0,
+    m.ClientType.ULTIMATE.value: 1,
+    m.ClientType.CORE.value: 2,
+}
+
+@functools.lru_cache(maxsize=None)
+def _parse_time_of_day(value: str) -> timedelta:
+    """Parses an 'HH:MM:SS' time-of-day string into a timedelta.
+
+    Cached because the same condition criteria strings recur across
+    assessments and conditions while strptime is comparatively slow.
+    """
+    parsed = datetime.strptime(value, '%H:%M:%S')
+    return timedelta(hours=parsed.hour, minutes=parsed.minute, seconds=parsed.second)
+
+@dataclass(slots=True, frozen=True)
+class _ActivityRoom:
+    """A candidate room assignment for one activity of a schedule."""
+    duration: int
+    id: str
+    room_id: str
+    room_floor: int
+
 class Solver:
     """A class for solving the scheduling problem of the assessments.
     
@@ -37,10 +88,13 @@ class Solver:
         self.__simultaneous_transfers = None
         
         self.__horizon = None
-        
-        self.__activity_type = collections.namedtuple('task_type', 'duration id room_id room_floor')
-        
+
         self.model = cp_model.CpModel()
+        # Bound once so the small condition helpers skip the attribute
+        # lookup on every one of their O(clients x conditions) calls
+        self.__add = self.model.Add
+        self.__model_built = False
+        self.__solver_mode = os.getenv('SOLVER_MODE', sm.SolverMode.GAPS.value)
         self.__scenario_action = None
         self.__resources = None
         self.__activities = None
@@ -48,6 +102,10 @@ class Solver:
         self.__general_conditions = None
         self.__room_conditions = None
         self.__schedules = []
+        self.__schedule_duration_bounds = []
+        self.__schedule_uids = []
+        self.__client_types = []
+        self.__client_sexes = []
         
         self.gaps = []
         self.floors = dict()
@@ -61,6 +119,9 @@ class Solver:
         
         self.starts_per_activity = collections.defaultdict(list)
         self.ends_per_activity = collections.defaultdict(list)
+        self.starts_per_client = collections.defaultdict(list)
+        self.rooms_per_client_activity = collections.defaultdict(list)
+        self.transfers_per_client = collections.defaultdict(list)
         self.intervals_per_room = collections.defaultdict(list)
         self.intervals_per_client =  collections.defaultdict(list)
         self.intervals_per_activity = collections.defaultdict(list)
@@ -72,9 +133,13 @@ class Solver:
         self.transfer_precedences = dict()
         self.transfer_floors = dict()
         
-        self.__clients_scenarios_map = dict()
+        # Indexed by the contiguous client ids, so a plain list suffices
+        self.__clients_scenarios = []
+        self.__room_index_vars = dict()
         self.__activities_uids_map = dict()
         self.__uids_activities_map = collections.defaultdict(list)
+        self.__uid_room_types_map = dict()
+        self.__scenario_activity_builders = dict()
     
     def __define_objective(self, mode: sm.SolverMode = sm.SolverMode.GAPS.value):
         """Helper function for defining the objective of the solver
@@ -111,57 +176,162 @@ class Solver:
                 continue
             
             activities = self.assessments[assessment_name].data['activities']
-            # TODO: Get duration according to gender if is_gender_time_allocated. Uses default for now
             # TODO: Activity ID for now is the activity name
-            schedule = []
-            _activities: List[m.Activity]
-            for _activities in activities:
-                activity_rooms = []
-                
-                activity: m.Activity
-                for activity in _activities:
-                    if activity.deleted:
-                        continue
-                    
-                    if not activity.enabled:
-                        continue
-                    
-                    room_type = activity.room_type if activity.resource_type == m.ResourceTypes.OTHER else m.ResourceTypes.CLIENT.value
-                    rooms = self.__rooms_map[room_type]
-                    room_count = 0
-                    
-                    room: m.Resource
-                    for room in rooms:
-                        if room_count >= self.__num_doctors and room_type == m.ResourceRoomTypes.DOCTOR_ROOM.value:
-                            break
-                        
+
+            def build_schedule(client_sex: m.ClientSex) -> list:
+                schedule = []
+                _activities: List[m.Activity]
+                for _activities in activities:
+                    activity_rooms = []
+
+                    activity: m.Activity
+                    for activity in _activities:
+                        if activity.deleted:
+                            continue
+
+                        if not activity.enabled:
+                            continue
+
+                        room_type = activity.room_type if activity.resource_type == m.ResourceTypes.OTHER else m.ResourceTypes.CLIENT.value
+                        rooms: List[m.Resource] = self.__rooms_map[room_type]
+                        if room_type == m.ResourceRoomTypes.DOCTOR_ROOM.value:
+                            rooms = rooms[:self.__num_doctors]
+
+                        if not rooms:
+                            continue
+
+                        # Duration and id only depend on the activity, not the room
                         duration = activity.time_allocations.default_time
-                        
                         if activity.is_gender_time_allocated:
-                            # TODO: support gender time allocated
-                            pass
-                        
-                        activity_rooms.append(self.__activity_type(duration, activity.activity_id, room.resource_id, room.location))
-                        
-                        self.__num_floors = max(self.__num_floors, room.location)
-                        
-                        room_count += 1
-                        
-                schedule.append(activity_rooms)
-                    
-            self.__schedules.extend([schedule] * num_clients)
+                            duration = getattr(activity.time_allocations, client_sex.value.lower(), None) or duration
+                        activity_id = activity.activity_id
+
+                        activity_rooms.extend(
+                            _ActivityRoom(duration, activity_id, room.resource_id, room.location)
+                            for room in rooms
+                        )
+
+                        self.__num_floors = max(self.__num_floors, max(room.location for room in rooms))
+
+                    schedule.append(activity_rooms)
+                return schedule
+
+            def duration_bounds_of(schedule: list) -> list:
+                duration_bounds = []
+                for activity_rooms in schedule:
+                    durations = [activity_room.duration for activity_room in activity_rooms]
+                    duration_bounds.append((min(durations), max(durations)))
+                return duration_bounds
+
+            # Gendered time allocations need a template per sex; otherwise
+            # all clients of the assessment share one schedule
+            is_gender_time_allocated = any(
+                activity.is_gender_time_allocated
+                for _activities in activities
+                for activity in _activities
+            )
+
+            male_schedule = build_schedule(m.ClientSex.MALE)
+            male_duration_bounds = duration_bounds_of(male_schedule)
+            if is_gender_time_allocated:
+                female_schedule = build_schedule(m.ClientSex.FEMALE)
+                female_duration_bounds = duration_bounds_of(female_schedule)
+            else:
+                female_schedule = male_schedule
+                female_duration_bounds = male_duration_bounds
+
+            # Males first, matching the client sex layout below
+            self.__schedules.extend([male_schedule] * num_male_clients + [female_schedule] * num_female_clients)
+            self.__schedule_duration_bounds.extend([male_duration_bounds] * num_male_clients + [female_duration_bounds] * num_female_clients)
+            # Client ids are assigned in assessment order with males first,
+            # so type and sex can be laid out once instead of re-derived
+            # from the counts for every client
+            self.__client_types.extend([m.ClientType(assessment_name)] * num_clients)
+            self.__client_sexes.extend([m.ClientSex.MALE] * num_male_clients + [m.ClientSex.FEMALE] * num_female_clients)
+
+        # Cached so the order helpers can normalize negative orders without
+        # re-measuring the schedule on every call
+        self.__schedule_lens = [len(schedule) for schedule in self.__schedules]
+
+    def __compute_activity_uids(self):
+        """Helper function for assigning one uid per activity group. Runs once per distinct schedule template instead of per client, so __define_variables only has to index the result.
+        """
+        uids_by_template = dict()
+        for schedule in self.__schedules:
+            template_key = id(schedule)
+            if template_key in uids_by_template:
+                self.__schedule_uids.append(uids_by_template[template_key])
+                continue
+
+            schedule_uids = []
+            for activities in schedule:
+                activity_ids = {activity.id for activity in activities}
+
+                if len(activity_ids) != 1:
+                    activity_uid = None
+                    for uid in activity_ids:
+                        if uid in self.__activities_uids_map:
+                            activity_uid = self.__activities_uids_map[uid]
+                            break
+
+                    if activity_uid is None:
+                        activity_uid = uuid.uuid4().hex
+                else:
+                    activity_uid = next(iter(activity_ids))
+
+                for activity_id in activity_ids:
+                    if self.__activities_uids_map.get(activity_id) != activity_uid:
+                        self.__activities_uids_map[activity_id] = activity_uid
+                        self.__uids_activities_map[activity_uid].append(activity_id)
+                        # Direct lookup for generate(); first variant of a
+                        # room type wins, like the linear scan it replaces
+                        activity = self.__ids_activities_map[activity_id]
+                        self.__uid_room_types_map.setdefault((activity_uid, activity.room_type), activity)
+                        # The invariant fields are bound once here;
+                        # generate() only fills in the room and time
+                        self.__scenario_activity_builders[activity_id] = functools.partial(m.ScenarioActivity, **activity.__dict__, movable=False)
+
+                schedule_uids.append(activity_uid)
+
+            uids_by_template[template_key] = schedule_uids
+            self.__schedule_uids.append(schedule_uids)
     
     def __define_variables(self):
         """Helper function for defining the variables of the solver
         """
         assert len(self.__schedules) > 0, 'Invalid schedules'
         start_time = datetime.now()
-        
-        start_activity_id = self.__activities_names_map['Check-in, Consent & Change'.lower()][0].activity_id
+
+        # Locals for the hot loop; attribute and bound-method lookups add up
+        # over clients x activities x rooms
+        model = self.model
+        new_int_var = model.NewIntVar
+        new_bool_var = model.NewBoolVar
+        add = model.Add
+        horizon = self.__horizon
+        num_floors = self.__num_floors
+        time_max_interval = self.__time_max_interval
+
+        # Starts and ends live on the scheduling grid; encoding that in the
+        # domain replaces two modulo constraints per activity. The clipped
+        # domains depend only on the minimum duration, so they are shared
+        # across all variables with the same bound instead of rebuilt per call
+        grid = cp_model.Domain.FromValues(list(range(0, horizon + 1, time_max_interval)))
+        new_int_var_from_domain = model.NewIntVarFromDomain
+        start_domains = dict()
+        end_domains = dict()
+
+        def grid_domains(min_duration):
+            if min_duration not in start_domains:
+                start_domains[min_duration] = grid.IntersectionWith(cp_model.Domain(0, horizon - min_duration))
+                end_domains[min_duration] = grid.IntersectionWith(cp_model.Domain(min_duration, horizon))
+            return start_domains[min_duration], end_domains[min_duration]
+
+        start_activity_id = self.__activities_names_map[ACTIVITY_CHECK_IN][0].activity_id
         previous_start = None
         for client_id, schedule in enumerate(self.__schedules):
-            client_type = self.__get_client_type(client_id)
-            client_sex = self.__get_client_sex_by_client_type_and_id(client_id)
+            client_type = self.__client_types[client_id]
+            client_sex = self.__client_sexes[client_id]
             
             client_scenario = m.ClientScenario(
                 client_id,
@@ -172,101 +342,111 @@ class Solver:
                 None,
                 start_time=self.scenario_action.first_client_arrival_time
             )
-            self.__clients_scenarios_map[client_id] = client_scenario
+            self.__clients_scenarios.append(client_scenario)
             
             previous_end = None
-            
+
+            schedule_uids = self.__schedule_uids[client_id]
             for i, activities in enumerate(schedule):
-                activity_uids = set([activity.id for activity in activities])
-                
-                if len(activity_uids) != 1:
-                    activity_uid = None
-                    for uid in activity_uids:
-                        if uid in self.__activities_uids_map:
-                            activity_uid = self.__activities_uids_map[uid]
-                            break
-                        
-                    if activity_uid is None:
-                        activity_uid = uuid.uuid4().hex                    
-                else:
-                    activity_uid = activity_uids.pop()
-                
-                for activity in activities:
-                    self.__activities_uids_map[activity.id] = activity_uid
-                    self.__uids_activities_map[activity_uid].append(activity.id)
+                activity_uid = schedule_uids[i]
+
+                min_duration, max_duration = self.__schedule_duration_bounds[client_id][i]
 
-                min_duration = activities[0].duration
-                max_duration = activities[0].duration
-                
-                for activity_room in activities[1:]:
-                    min_duration = min(min_duration, activity_room.duration)
-                    max_duration = max(max_duration, activity_room.duration)
-                
                 suffix = f'_c{client_id}_a{activity_uid}'
-                start = self.model.NewIntVar(0, self.__horizon, f'start{suffix}')
-                duration = self.model.NewIntVar(min_duration, max_duration, f'duration{suffix}')
-                end = self.model.NewIntVar(0, self.__horizon, f'end{suffix}')
-                interval = self.model.NewIntervalVar(start, duration, end, f'interval{suffix}')
-                floor = self.model.NewIntVar(0, self.__num_floors, f'floor{suffix}')
-                order = self.model.NewIntVar(0, len(schedule) - 1, f'order{suffix}')
-                
+                # Starts late enough to fit the shortest room and ends no
+                # earlier than it; trims the domains before propagation starts
+                start_domain, end_domain = grid_domains(min_duration)
+                start = new_int_var_from_domain(start_domain, f'start{suffix}')
+                if min_duration == max_duration:
+                    duration = min_duration
+                else:
+                    duration = new_int_var(min_duration, max_duration, f'duration{suffix}')
+                end = new_int_var_from_domain(end_domain, f'end{suffix}')
+                interval = model.NewIntervalVar(start, duration, end, f'interval{suffix}')
+                floor = new_int_var(0, num_floors, f'floor{suffix}')
+                order = new_int_var(0, len(schedule) - 1, f'order{suffix}')
+
                 self.starts[(client_id, activity_uid)] = start
                 self.ends[(client_id, activity_uid)] = end
                 self.intervals[(client_id, activity_uid)] = interval
                 self.floors[(client_id, activity_uid)] = floor
                 self.orders[(client_id, activity_uid)] = order
-                
-                self.model.AddModuloEquality(0, start, self.__time_max_interval)
-                self.model.AddModuloEquality(0, end, self.__time_max_interval)
-                               
+
                 previous_end = end
                 if activity_uid == start_activity_id:
                     if previous_start == None:
-                        self.model.Add(start == 0)
+                        add(start == 0)
                     else:
-                        self.model.Add(start > previous_start)
+                        # Client order is interchangeable, so break the
+                        # symmetry with the tightest grid-aware bound
+                        add(start >= previous_start + time_max_interval)
                     previous_start = start
+                    # The staggered arrivals are a known-good assignment, so
+                    # seed the search with them
+                    model.AddHint(start, client_id * time_max_interval)
                         
                 self.starts_per_activity[activity_uid].append(start)
                 self.ends_per_activity[activity_uid].append(end)
+                self.starts_per_client[client_id].append((activity_uid, start))
                   
                 if len(activities) > 1:
+                    # Alternative pattern: each candidate room gets an
+                    # optional interval sharing the master start, and picking
+                    # the room pins the master end and floor. The master
+                    # interval keeps start + duration == end consistent.
                     current_activity_rooms = []
                     for activity_room in activities:
                         other_suffix = f'_c{client_id}_a{activity_uid}_r{activity_room.room_id}'
-                        current_start = self.model.NewIntVar(0, self.__horizon, f'start{other_suffix}')
                         current_duration = activity_room.duration
-                        current_end = self.model.NewIntVar(0, self.__horizon, f'end{other_suffix}')
-                        current_room = self.model.NewBoolVar(f'room{other_suffix}')
-                        current_interval = self.model.NewOptionalIntervalVar(current_start, current_duration, current_end, current_room, f'interval{other_suffix}')
-                        current_floor = self.model.NewIntVar(0, self.__num_floors, f'floor{other_suffix}')
-                        
+                        current_room = new_bool_var(f'room{other_suffix}')
+                        current_interval = model.NewOptionalFixedSizeIntervalVar(start, current_duration, current_room, f'interval{other_suffix}')
+
                         current_activity_rooms.append(current_room)
                         self.intervals_per_room[activity_room.room_id].append(current_interval)
                         self.intervals_per_client[client_id].append(current_interval)
                         self.intervals_per_activity[activity_uid].append(current_interval)
                         self.rooms_per_activity[(activity_uid, activity_room.room_id)].append(current_room)
-                        
+
                         self.rooms[(client_id, activity_uid, activity_room.room_id)] = current_room
-                        
-                        self.model.Add(current_start == start).OnlyEnforceIf(current_room)
-                        self.model.Add(current_end == end).OnlyEnforceIf(current_room)
-                        self.model.Add(current_duration == duration).OnlyEnforceIf(current_room)                        
-                        self.model.Add(current_floor == activity_room.room_floor).OnlyEnforceIf(current_room)
-                        self.model.Add(current_floor == floor).OnlyEnforceIf(current_room)
-                        
-                    self.model.AddExactlyOne(current_activity_rooms)
+                        self.rooms_per_client_activity[(client_id, activity_uid)].append((activity_room.room_id, current_room))
+
+                    model.AddExactlyOne(current_activity_rooms)
+
+                    # Channel a single index variable to the room literals
+                    # (in room id order, matching __get_room_index_var) and
+                    # let element constraints derive floor and duration from
+                    # it instead of one reified equality per room
+                    room_choices = sorted(zip(activities, current_activity_rooms), key=lambda choice: choice[0].room_id)
+                    room_index = new_int_var(0, len(room_choices) - 1, f'room_index_c{client_id}_a{activity_uid}')
+                    for position, (_, literal) in enumerate(room_choices):
+                        add(room_index == position).OnlyEnforceIf(literal)
+                    self.__room_index_vars[(client_id, activity_uid)] = room_index
+
+                    model.AddElement(room_index, [activity_room.room_floor for activity_room, _ in room_choices], floor)
+                    if min_duration != max_duration:
+                        model.AddElement(room_index, [activity_room.duration for activity_room, _ in room_choices], duration)
                 else:
-                    self.intervals_per_room[activity.room_id].append(interval)
+                    activity_room = activities[0]
+                    self.intervals_per_room[activity_room.room_id].append(interval)
                     self.intervals_per_client[client_id].append(interval)
                     self.intervals_per_activity[activity_uid].append(interval)
-                    
-                    self.rooms[(client_id, activity_uid, activity.room_id)] = self.model.NewConstant(1)
-                    
-                    self.model.Add(floor == activity.room_floor)
+
+                    self.rooms[(client_id, activity_uid, activity_room.room_id)] = model.NewConstant(1)
+                    self.rooms_per_client_activity[(client_id, activity_uid)].append((activity_room.room_id, self.rooms[(client_id, activity_uid, activity_room.room_id)]))
+
+                    add(floor == activity_room.room_floor)
                 
             self.ends_per_client.append(previous_end)
-        
+
+        # Freeze after build so later lookups cannot autovivify empty entries.
+        # intervals_per_client stays a defaultdict; transfer intervals are
+        # still appended to it while transfer constraints are applied.
+        self.rooms_per_activity = dict(self.rooms_per_activity)
+        self.intervals_per_room = dict(self.intervals_per_room)
+        self.intervals_per_activity = dict(self.intervals_per_activity)
+        self.starts_per_activity = dict(self.starts_per_activity)
+        self.ends_per_activity = dict(self.ends_per_activity)
+
         end_time = datetime.now()
         print(f'Total Time for defining variables: {(end_time - start_time).total_seconds() / 60.0} minutes')
     
@@ -281,40 +461,45 @@ class Solver:
         - Room conditions
         """
         start_time = datetime.now()
-        check_in_id = self.__activities_uids_map[self.activities_names_map['Check-in, Consent & Change'.lower()][0].activity_id]
-        first_consult_id = self.__activities_uids_map[self.activities_names_map['Consultation and Physical'.lower()][0].activity_id]
-        final_consult_id = self.__activities_uids_map[self.activities_names_map['Final Consult'.lower()][0].activity_id]
-        
-        mri_elite_id = self.__activities_uids_map.get(self.activities_names_map['MRI Optimal'.lower()][0].activity_id, None) if self.assessments[m.ClientType.OPTIMAL.value].enabled else None
-        mri_ultimate_id = self.__activities_uids_map.get(self.activities_names_map['MRI Ultimate'.lower()][0].activity_id, None) if self.assessments[m.ClientType.ULTIMATE.value].enabled else None
-        
+        names = self.activities_names_map
+        uids = self.__activities_uids_map
+        check_in_id = uids[names[ACTIVITY_CHECK_IN][0].activity_id]
+        first_consult_id = uids[names[ACTIVITY_FIRST_CONSULT][0].activity_id]
+        final_consult_id = uids[names[ACTIVITY_FINAL_CONSULT][0].activity_id]
+        lunch_id = names[ACTIVITY_LUNCH][0].activity_id
+        checkout_id = names[ACTIVITY_CHECKOUT][0].activity_id
+
+        mri_elite_id = uids.get(names[ACTIVITY_MRI_OPTIMAL][0].activity_id, None) if self.assessments[m.ClientType.OPTIMAL.value].enabled else None
+        mri_ultimate_id = uids.get(names[ACTIVITY_MRI_ULTIMATE][0].activity_id, None) if self.assessments[m.ClientType.ULTIMATE.value].enabled else None
+
+        same_room_pairs = [
+            (check_in_id, lunch_id),
+            (check_in_id, checkout_id),
+            (first_consult_id, final_consult_id),
+        ]
+
         for client_id, schedule in enumerate(self.__schedules):
             self.__apply_no_overlap_client_constraint(client_id)
-            
-            lunch_id = self.activities_names_map['Lunch'.lower()][0].activity_id
-            
-            self.__apply_same_room_for_activities_constraint(client_id, check_in_id, lunch_id)
-            
-            checkout_id = self.activities_names_map['Checkout'.lower()][0].activity_id
-            
-            self.__apply_same_room_for_activities_constraint(client_id, check_in_id, checkout_id)
-            
-            self.__apply_same_room_for_activities_constraint(client_id, first_consult_id, final_consult_id)
+
+            self.__apply_same_room_for_activity_pairs_constraint(client_id, same_room_pairs)
                 
+        check_in_rooms = {room_id for activity_uid, room_id in self.rooms_per_activity if activity_uid == check_in_id}
+        first_consult_rooms = {room_id for activity_uid, room_id in self.rooms_per_activity if activity_uid == first_consult_id}
+        final_consult_rooms = {room_id for activity_uid, room_id in self.rooms_per_activity if activity_uid == final_consult_id}
+
         for room_id in self.intervals_per_room.keys():
             self.__apply_no_overlap_room_constraint(room_id)
-            
-            if (check_in_id, room_id) in self.rooms_per_activity:
+
+            if room_id in check_in_rooms:
                 self.__apply_unique_room_for_activity_constraint(room_id, check_in_id)
-            
-            if (first_consult_id, room_id) in self.rooms_per_activity:
+
+            if room_id in first_consult_rooms:
                 self.__apply_maximum_capacity_constraint(room_id, first_consult_id, 3)
-                
-            if (final_consult_id, room_id) in self.rooms_per_activity:
+
+            if room_id in final_consult_rooms:
                 self.__apply_maximum_capacity_constraint(room_id, final_consult_id, 3)
         
         self.__apply_transfer_constraint()
-        self.__apply_maximum_time_constraint()
         self.__apply_simultaneous_transfers_constraint(self.__simultaneous_transfers)
         self.__apply_no_overlap_activity_constraint(check_in_id)
 
@@ -342,26 +527,13 @@ class Solver:
     def __apply_gap_between_activity_constraint(self, *activity_ids):
         """Helper function for applying the gap between activities at specific room of the solver. Forces time max interval gaps between activities at specific room.
         """
-        starts_per_activity = [start for activity_id in activity_ids for start in self.starts_per_activity[activity_id] if activity_id is not None]
-        
-        ends_per_activity = [end for activity_id in activity_ids for end in self.ends_per_activity[activity_id] if activity_id is not None]
-        
-        for start in starts_per_activity:
-            for end in ends_per_activity:
-                self.model.Add(start != end)
-                
-            for other_start in starts_per_activity:
-                if start == other_start:
-                    continue
-                
-                self.model.Add(start != other_start)
-                
-        for end in ends_per_activity:
-            for other_end in ends_per_activity:
-                if end == other_end:
-                    continue
-                
-                self.model.Add(end != other_end)
+        starts_per_activity = [start for activity_id in activity_ids if activity_id is not None for start in self.starts_per_activity[activity_id]]
+
+        ends_per_activity = [end for activity_id in activity_ids if activity_id is not None for end in self.ends_per_activity[activity_id]]
+
+        # One global constraint covers the pairwise start/start, end/end and
+        # start/end inequalities the nested loops used to post
+        self.model.AddAllDifferent(starts_per_activity + ends_per_activity)
     
     def __apply_simultaneous_transfers_constraint(self, generate: bool = True):
         """Helper function for applying allowing simultaneous transfers constraint of the solver.
@@ -372,80 +544,117 @@ class Solver:
     def __apply_transfer_constraint(self):
         """Helper function for applying the transfer constraint of the solver.
         """
+        # The gap-counting booleans only feed the GAPS objective; under
+        # MAKESPAN they would be dead weight for the presolver
+        track_gaps = self.__solver_mode == sm.SolverMode.GAPS.value
+
+        # Transfers start on the same grid as the activities; like the
+        # activity starts, the stride lives in the domain instead of a
+        # modulo constraint per pair
+        transfer_grid = cp_model.Domain.FromValues(list(range(0, self.__horizon + 1, self.__time_max_interval)))
+
+        # Locals for the quadratic loop; every pair otherwise re-resolves
+        # the model methods and variable maps through self
+        model = self.model
+        add = model.Add
+        add_bool_or = model.AddBoolOr
+        new_bool_var = model.NewBoolVar
+        starts = self.starts
+        ends = self.ends
+        floors = self.floors
+        orders = self.orders
+        time_max_gap = self.__time_max_gap
+        transfer_duration = self.__time_transfer
+
+        # Variable names only show up in an exported model; skip the
+        # per-pair f-string construction unless a dump was requested
+        debug_names = bool(os.getenv('SOLVER_EXPORT_MODEL_FILE'))
+
         for client_id, schedule in enumerate(self.__schedules):
+            # The circuit needs an arc per ordered pair, so the precomputed
+            # per-template uid list avoids map lookups in the loop below
+            uids = self.__schedule_uids[client_id]
+
             arcs = []
-            for activity_index, activities in enumerate(schedule):                
-                activity_id = self.__activities_uids_map[activities[0].id]
-                
-                first_activity = self.model.NewBoolVar(f'{activity_index} is first activity')
-                last_activity = self.model.NewBoolVar(f'{activity_index} is last activity')
-                
+            for activity_index, activities in enumerate(schedule):
+                activity_id = uids[activity_index]
+
+                first_activity = new_bool_var(f'{activity_index} is first activity' if debug_names else '')
+                last_activity = new_bool_var(f'{activity_index} is last activity' if debug_names else '')
+
                 arcs.append((0, activity_index + 1, first_activity))
                 arcs.append((activity_index + 1, 0, last_activity))
-                
-                for other_activity_index, other_activities in enumerate(schedule):
+
+                activity_order = orders[(client_id, activity_id)]
+                activity_end = ends[(client_id, activity_id)]
+                activity_floor = floors[(client_id, activity_id)]
+
+                add(activity_order == 0).OnlyEnforceIf(first_activity)
+
+                for other_activity_index, other_activity_id in enumerate(uids):
                     if activity_index == other_activity_index:
                         continue
-                        
-                    other_activity_id = self.__activities_uids_map[other_activities[0].id]
-                    
-                    consecutive_activities = self.model.NewBoolVar(f'{other_activity_id} is after {activity_id}')
+
+                    other_activity_start = starts[(client_id, other_activity_id)]
+                    other_activity_floor = floors[(client_id, other_activity_id)]
+
+                    consecutive_activities = new_bool_var(f'{other_activity_id} is after {activity_id}' if debug_names else '')
                     self.transfer_precedences[(client_id, activity_index, other_activity_index)] = consecutive_activities
-                    
+
                     arcs.append((activity_index + 1, other_activity_index + 1, consecutive_activities))
-                    
-                    self.model.Add(self.orders[(client_id, other_activity_id)] > self.orders[client_id, activity_id]).OnlyEnforceIf(consecutive_activities)
-                    
-                    suffix = f'_trf_c_{client_id}_a_{activity_id}_a_{other_activity_id}'
-                    transfer_floor = self.model.NewBoolVar(f'floor{suffix}')
-                    self.model.Add(self.floors[(client_id, activity_id)] != self.floors[(client_id, other_activity_id)]).OnlyEnforceIf(transfer_floor)
-                    self.model.Add(self.floors[(client_id, activity_id)] == self.floors[(client_id, other_activity_id)]).OnlyEnforceIf(transfer_floor.Not())
-                    
-                    transfer_start = self.model.NewIntVar(0, self.__horizon, f'start{suffix}')
-                    transfer_end = self.model.NewIntVar(0, self.__horizon, f'end{suffix}')
-                    transfer_duration = self.__time_transfer
-                    transfer_interval = self.model.NewOptionalIntervalVar(transfer_start, transfer_duration, transfer_end, consecutive_activities, f'interval{suffix}')
-                    
-                    self.model.Add(transfer_start == self.ends[(client_id, activity_id)]).OnlyEnforceIf(transfer_floor, consecutive_activities)
-                    self.model.Add(transfer_end == self.starts[(client_id, other_activity_id)]).OnlyEnforceIf(transfer_floor, consecutive_activities)
-                    
-                    self.model.Add(self.starts[(client_id, other_activity_id)] == self.ends[(client_id, activity_id)]).OnlyEnforceIf(transfer_floor.Not(), consecutive_activities)
-                    # self.model.Add(self.starts[(client_id, other_activity_id)] - self.ends[(client_id, activity_id)] <= self.__time_max_gap).OnlyEnforceIf(transfer_floor.Not(), consecutive_activities)
-                    
-                    self.model.AddModuloEquality(0, transfer_start, self.__time_max_interval)
-                    self.model.AddModuloEquality(0, transfer_end, self.__time_max_interval)
-                    
-                    # For getting the number of gaps
-                    consecutive_orders = self.model.NewBoolVar(f'{other_activity_id} order is after {activity_id} order')
-                    self.model.Add(self.starts[(client_id, other_activity_id)] - self.ends[(client_id, activity_id)] <= self.__time_max_gap).OnlyEnforceIf(consecutive_orders)
-                    self.model.Add(self.starts[(client_id, other_activity_id)] - self.ends[(client_id, activity_id)] > self.__time_max_gap).OnlyEnforceIf(consecutive_orders.Not())
-                    
-                    zero_time_difference = self.model.NewBoolVar(f'difference of {other_activity_id} and {activity_id} is equal to zero')
-                    self.model.Add(self.starts[(client_id, other_activity_id)] - self.ends[(client_id, activity_id)] != 0).OnlyEnforceIf(zero_time_difference)
-                    self.model.Add(self.starts[(client_id, other_activity_id)] - self.ends[(client_id, activity_id)] == 0).OnlyEnforceIf(zero_time_difference.Not())
-                    
-                    existing_gap = self.model.NewBoolVar(f'gap between {other_activity_id} and {activity_id} exists')
-                    self.model.Add(existing_gap == 1).OnlyEnforceIf(transfer_floor.Not(), consecutive_activities, consecutive_orders, zero_time_difference)
-                    self.model.Add(existing_gap == 0).OnlyEnforceIf(transfer_floor.Not(), consecutive_activities, consecutive_orders, zero_time_difference.Not())
-                    
-                    self.gaps.append(existing_gap)
-                    
+
+                    add(orders[(client_id, other_activity_id)] == activity_order + 1).OnlyEnforceIf(consecutive_activities)
+
+                    suffix = f'_trf_c_{client_id}_a_{activity_id}_a_{other_activity_id}' if debug_names else ''
+                    transfer_floor = new_bool_var(f'floor{suffix}' if debug_names else '')
+                    not_transfer_floor = transfer_floor.Not()
+                    add(activity_floor != other_activity_floor).OnlyEnforceIf(transfer_floor)
+                    add(activity_floor == other_activity_floor).OnlyEnforceIf(not_transfer_floor)
+
+                    transfer_start = model.NewIntVarFromDomain(transfer_grid, f'start{suffix}' if debug_names else '')
+                    transfer_interval = model.NewOptionalFixedSizeIntervalVar(transfer_start, transfer_duration, consecutive_activities, f'interval{suffix}' if debug_names else '')
+                    transfer_end = transfer_start + transfer_duration
+
+                    enforce_different_floor = [transfer_floor, consecutive_activities]
+                    enforce_same_floor = [not_transfer_floor, consecutive_activities]
+
+                    add(transfer_start == activity_end).OnlyEnforceIf(enforce_different_floor)
+                    add(transfer_end == other_activity_start).OnlyEnforceIf(enforce_different_floor)
+
+                    add(other_activity_start == activity_end).OnlyEnforceIf(enforce_same_floor)
+                    # add(other_activity_start - activity_end <= time_max_gap).OnlyEnforceIf(enforce_same_floor)
+
+                    if track_gaps:
+                        # For getting the number of gaps
+                        consecutive_orders = new_bool_var(f'{other_activity_id} order is after {activity_id} order' if debug_names else '')
+                        add(other_activity_start - activity_end <= time_max_gap).OnlyEnforceIf(consecutive_orders)
+                        add(other_activity_start - activity_end > time_max_gap).OnlyEnforceIf(consecutive_orders.Not())
+
+                        zero_time_difference = new_bool_var(f'difference of {other_activity_id} and {activity_id} is equal to zero' if debug_names else '')
+                        add(other_activity_start - activity_end != 0).OnlyEnforceIf(zero_time_difference)
+                        add(other_activity_start - activity_end == 0).OnlyEnforceIf(zero_time_difference.Not())
+
+                        existing_gap = new_bool_var(f'gap between {other_activity_id} and {activity_id} exists' if debug_names else '')
+                        # Pure Boolean logic, so clauses feed the SAT core
+                        # directly instead of going through enforced
+                        # linear reifications
+                        premise = [literal.Not() for literal in enforce_same_floor] + [consecutive_orders.Not()]
+                        add_bool_or(premise + [zero_time_difference.Not(), existing_gap])
+                        add_bool_or(premise + [zero_time_difference, existing_gap.Not()])
+
+                        self.gaps.append(existing_gap)
+
+
                     self.transfer_starts[(client_id, activity_index, other_activity_index)] = transfer_start
                     self.transfer_ends[(client_id, activity_index, other_activity_index)] = transfer_end
                     self.transfer_intervals[(client_id, activity_index, other_activity_index)] = transfer_interval
-                    
+
                     self.transfer_floors[(client_id, activity_index, other_activity_index)] = transfer_floor
+                    self.transfers_per_client[client_id].append((client_id, activity_index, other_activity_index))
                     
                     self.intervals_per_client[client_id].append(transfer_interval)
                     
-            self.model.AddCircuit(arcs)
-    
-    def __apply_maximum_time_constraint(self, generate: bool = True):
-        """Helper function for applying the maximum time constraint of the solver.
-        """
-        if generate:
-            for end in self.ends_per_client:
-                self.model.Add(end <= self.__horizon)
+            model.AddCircuit(arcs)
     
     def __apply_activity_constraints(self):
         """Helper function for applying all activity constraints of the solver namely:
@@ -459,14 +668,33 @@ class Solver:
         - Within before activity constraint
         """
         start_time = datetime.now()
-        
-        start_activity_id = self.__activities_names_map['Check-in, Consent & Change'.lower()][0].activity_id
-        
+
+        start_activity_id = self.__activities_names_map[ACTIVITY_CHECK_IN][0].activity_id
+
+        # Each condition resolves to one bound handler up front; the
+        # per-client loop below is then a single call per client instead of
+        # walking the whole type/criteria ladder every time
+        dispatch = {
+            (m.ConditionTypes.BEFORE, m.CriteriaTypes.ACTIVITY): self.__apply_before_activity_constraint,
+            (m.ConditionTypes.BEFORE, m.CriteriaTypes.TIME): self.__apply_before_time_constraint,
+            (m.ConditionTypes.BEFORE, m.CriteriaTypes.ORDER): self.__apply_before_order_constraint,
+            (m.ConditionTypes.AFTER, m.CriteriaTypes.ACTIVITY): self.__apply_after_activity_constraint,
+            (m.ConditionTypes.AFTER, m.CriteriaTypes.TIME): self.__apply_after_time_constraint,
+            (m.ConditionTypes.AFTER, m.CriteriaTypes.ORDER): self.__apply_after_order_constraint,
+            (m.ConditionTypes.RIGHT_AFTER, m.CriteriaTypes.ACTIVITY): self.__apply_right_after_activity_constraint,
+            (m.ConditionTypes.BETWEEN, m.CriteriaTypes.ACTIVITY): self.__apply_between_activities_constraint,
+            (m.ConditionTypes.BETWEEN, m.CriteriaTypes.TIME): self.__apply_between_times_constraint,
+            (m.ConditionTypes.BETWEEN, m.CriteriaTypes.ORDER): self.__apply_between_orders_constraint,
+            (m.ConditionTypes.IN_FIXED_ORDER_AS, m.CriteriaTypes.ORDER): self.__apply_order_constraint,
+        }
+
         previous_num_clients = 0
         for assessment in self.assessments.values():
             if not assessment.enabled:
                 continue
-            
+
+            client_range = range(previous_num_clients, previous_num_clients + assessment.data['num_clients'])
+
             condition: m.Condition
             for condition in assessment.data['activity_conditions']:
                 if condition.deleted:
@@ -515,30 +743,34 @@ class Solver:
                         condition_criteria_value = self.__activities_uids_map.get(str(condition_criteria_value), None)
                 elif condition_criteria_type == m.CriteriaTypes.TIME:
                     if condition_type == m.ConditionTypes.BETWEEN:
-                        is_valid_format = len(re.findall(r':', condition_criteria_between_values_start)) == 2
-                        
-                        if not is_valid_format:
+                        if condition_criteria_between_values_start.count(':') != 2:
                             condition_criteria_between_values_start += ':00'
-                            condition_criteria_between_values_start = datetime.strptime(condition_criteria_between_values_start, "%H:%M:%S")
-                            condition_criteria_between_values_start = timedelta(hours=condition_criteria_between_values_start.hour, minutes=condition_criteria_between_values_start.minute, seconds=condition_criteria_between_values_start.second)
-                            
-                        is_valid_format = len(re.findall(r':', condition_criteria_between_values_end)) == 2
-                        
-                        if not is_valid_format:
+                        condition_criteria_between_values_start = _parse_time_of_day(condition_criteria_between_values_start)
+
+                        if condition_criteria_between_values_end.count(':') != 2:
                             condition_criteria_between_values_end += ':00'
-                            condition_criteria_between_values_end = datetime.strptime(condition_criteria_between_values_end, "%H:%M:%S")
-                            condition_criteria_between_values_end = timedelta(hours=condition_criteria_between_values_end.hour, minutes=condition_criteria_between_values_end.minute, seconds=condition_criteria_between_values_end.second)
+                        condition_criteria_between_values_end = _parse_time_of_day(condition_criteria_between_values_end)
+
+                        # Time criteria are converted to horizon minutes once here;
+                        # the constraint helpers only see plain ints
+                        condition_criteria_between_values_start = int((condition_criteria_between_values_start - self.__time_start).total_seconds() // 60)
+                        condition_criteria_between_values_end = int((condition_criteria_between_values_end - self.__time_start).total_seconds() // 60)
                     else:
-                        time_format = len(re.findall(r':', condition_criteria_value))
-                        
-                        if time_format == 1:
-                            condition_criteria_value += ':00'
-                            condition_criteria_value = datetime.strptime(condition_criteria_value, "%H:%M:%S")
-                            condition_criteria_value = timedelta(hours=condition_criteria_value.hour, minutes=condition_criteria_value.minute, seconds=condition_criteria_value.second)
-                            
-                        elif time_format == 0:
+                        colons = condition_criteria_value.count(':')
+
+                        if colons == 0:
                             condition_criteria_value = timedelta(minutes=int(condition_criteria_value))
-                        
+                        else:
+                            if colons == 1:
+                                condition_criteria_value += ':00'
+                            condition_criteria_value = _parse_time_of_day(condition_criteria_value)
+
+                        if condition_type != m.ConditionTypes.WITHIN:
+                            condition_criteria_value = int((condition_criteria_value - self.__time_start).total_seconds() // 60)
+                        else:
+                            # WITHIN criteria are durations, not clock times
+                            condition_criteria_value = int(condition_criteria_value.total_seconds() // 60)
+
                 elif condition_criteria_type == m.CriteriaTypes.ORDER:
                     if condition_type == m.ConditionTypes.WITHIN:
                         condition_criteria_between_values_start = int(condition_criteria_between_values_start)
@@ -546,51 +778,23 @@ class Solver:
                     else:
                         condition_criteria_value = int(condition_criteria_value)
 
-                for client_id in range(previous_num_clients, previous_num_clients + assessment.data['num_clients']):
-                    if condition_type == m.ConditionTypes.BEFORE:
-                        if condition_criteria_type == m.CriteriaTypes.ACTIVITY:
-                            self.__apply_before_activity_constraint(client_id, condition_activity_id, condition_criteria_value)
-                        elif condition_criteria_type == m.CriteriaTypes.TIME:
-                            self.__apply_before_time_constraint(client_id, condition_activity_id, condition_criteria_value)
-                        elif condition_criteria_type == m.CriteriaTypes.ORDER:
-                            self.__apply_before_order_constraint(client_id, condition_activity_id, condition_criteria_value)
-                        else:
-                            raise ValueError('Invalid condition option type for before activity constraint')
-                    elif condition_type == m.ConditionTypes.AFTER:
-                        if condition_criteria_type == m.CriteriaTypes.ACTIVITY:
-                            self.__apply_after_activity_constraint(client_id, condition_activity_id, condition_criteria_value)
-                        elif condition_criteria_type == m.CriteriaTypes.TIME:
-                            self.__apply_after_time_constraint(client_id, condition_activity_id, condition_criteria_value)
-                        elif condition_criteria_type == m.CriteriaTypes.ORDER:
-                            self.__apply_after_order_constraint(client_id, condition_activity_id, condition_criteria_value)
-                        else:
-                            raise ValueError('Invalid condition option type for after activity constraint')
-                    elif condition_type == m.ConditionTypes.RIGHT_AFTER:
-                        if condition_criteria_type == m.CriteriaTypes.ACTIVITY:
-                            self.__apply_right_after_activity_constraint(client_id, condition_activity_id, condition_criteria_value)
-                        else:
-                            raise ValueError('Invalid condition option type for right after activity constraint')
-                    elif condition_type == m.ConditionTypes.BETWEEN:
-                        if condition_criteria_type == m.CriteriaTypes.ACTIVITY:
-                            self.__apply_between_activities_constraint(client_id, condition_activity_id, condition_criteria_between_values_start, condition_criteria_between_values_end)
-                        elif condition_criteria_type == m.CriteriaTypes.TIME:
-                            self.__apply_between_times_constraint(client_id, condition_activity_id, condition_criteria_between_values_start, condition_criteria_between_values_end)
-                        elif condition_criteria_type == m.CriteriaTypes.ORDER:
-                            self.__apply_between_orders_constraint(client_id, condition_activity_id, condition_criteria_between_values_start, condition_criteria_between_values_end)
-                        else:
-                            raise ValueError('Invalid condition option type for between constraint')
-                    elif condition_type == m.ConditionTypes.WITHIN:
-                        other_activity_id = start_activity_id
-                        self.__apply_within_after_activity_constraint(client_id, condition_activity_id, other_activity_id, condition_criteria_value)
-                    elif condition_type == m.ConditionTypes.IN_FIXED_ORDER_AS:
-                        if condition_criteria_type == m.CriteriaTypes.ORDER:
-                            self.__apply_order_constraint(client_id, condition_activity_id, condition_criteria_value)
-                        else:
-                            raise ValueError('Invalid condition option type for in fixed order as constraint')
-                    # else:
-                    #     raise ValueError('Invalid condition option')
+                if condition_type == m.ConditionTypes.WITHIN:
+                    handler = self.__apply_within_after_activity_constraint
+                    args = (condition_activity_id, start_activity_id, condition_criteria_value)
+                elif condition_type == m.ConditionTypes.BETWEEN:
+                    handler = dispatch.get((condition_type, condition_criteria_type))
+                    args = (condition_activity_id, condition_criteria_between_values_start, condition_criteria_between_values_end)
+                else:
+                    handler = dispatch.get((condition_type, condition_criteria_type))
+                    args = (condition_activity_id, condition_criteria_value)
+
+                if handler is None:
+                    raise ValueError(f'Invalid condition option type for {condition_type.value.lower()} constraint')
+
+                for client_id in client_range:
+                    handler(client_id, *args)
 
-            previous_num_clients += assessment.data['num_clients']
+            previous_num_clients = client_range.stop
                 
         end_time = datetime.now()
         print(f'Total Time for applying activity constraints: {(end_time - start_time).total_seconds() / 60.0} minutes')
@@ -608,20 +812,20 @@ class Solver:
         if not generate:
             return
         
-        self.model.Add(self.ends[(client_id, activity_id)] <= self.starts[(client_id, other_activity_id)])
+        self.__add(self.ends[(client_id, activity_id)] <= self.starts[(client_id, other_activity_id)])
         
-    def __apply_before_time_constraint(self, client_id: int, activity_id: int, time_before: timedelta, generate: bool = True):
+    def __apply_before_time_constraint(self, client_id: int, activity_id: int, time_before: int, generate: bool = True):
         """[Activity Condition] Applies the condition that an activity must be before a certain time; end time of activity <= time_before.
 
         Args:
             client_id (int): the id of the client
             activity_id (int): the id of the activity
-            time_before (int): the maximum time limit for the end of the activity
+            time_before (int): the maximum time limit in horizon minutes for the end of the activity
             generate (bool): whether to generate or avoid generating the constraint
         """
-        if generate:
-            time_before = int((time_before - self.__time_start).total_seconds() // 60)
-            self.model.Add(self.ends[(client_id, activity_id)] <= time_before)           
+        if not generate:
+            return
+        self.__add(self.ends[(client_id, activity_id)] <= time_before)
     
     def __apply_before_order_constraint(self, client_id, activity_id: int, order: int, generate: bool = True):
         """[Activity Condition] Applies the condition that an activity must be before a certain order; end time of activity <= start time of another activity at given order.
@@ -635,9 +839,9 @@ class Solver:
             return
         
         if order < 0:
-            order += len(self.__schedules[client_id])
+            order += self.__schedule_lens[client_id]
         
-        self.model.Add(self.orders[(client_id, activity_id)] < order)
+        self.__add(self.orders[(client_id, activity_id)] < order)
     
     def __apply_after_activity_constraint(self, client_id, activity_id: int, other_activity_id: int, generate: bool = True):
         """[Activity Condition] Applies the condition that an activity must be after another activity; start time of activity >= end time of another activity.
@@ -647,20 +851,21 @@ class Solver:
             other_activity_id (int): the id of the other activity
             generate (bool): whether to generate or avoid generating the constraint
         """
-        if generate:
-            self.model.Add(self.starts[(client_id, activity_id)] >= self.ends[(client_id, other_activity_id)])
-    
-    def __apply_after_time_constraint(self, client_id, activity_id: int, time_after: timedelta, generate: bool = True):
+        if not generate:
+            return
+        self.__add(self.starts[(client_id, activity_id)] >= self.ends[(client_id, other_activity_id)])
+
+    def __apply_after_time_constraint(self, client_id, activity_id: int, time_after: int, generate: bool = True):
         """[Activity Condition] Applies the condition that an activity must be after a certain time; start time of activity >= time_after.
 
         Args:
             activity_id (int): the id of the activity
-            time_after (int): the minimum time limit for the start of the activity
+            time_after (int): the minimum time limit in horizon minutes for the start of the activity
             generate (bool): whether to generate or avoid generating the constraint
         """
-        if generate:
-            time_after = int((time_after - self.__time_start).total_seconds() // 60)
-            self.model.Add(self.starts[(client_id, activity_id)] >= time_after)
+        if not generate:
+            return
+        self.__add(self.starts[(client_id, activity_id)] >= time_after)
     
     def __apply_after_order_constraint(self, client_id, activity_id: int, order: int, generate: bool = True):
         """[Activity Condition] Applies the condition that an activity must be after a certain order; start time of activity >= end time of another activity at given order.
@@ -674,9 +879,9 @@ class Solver:
             return
         
         if order < 0:
-            order += len(self.__schedules[client_id])
+            order += self.__schedule_lens[client_id]
         
-        self.model.Add(self.orders[(client_id, activity_id)] > order)
+        self.__add(self.orders[(client_id, activity_id)] > order)
     
     def __apply_right_after_activity_constraint(self, client_id, activity_id: int, other_activity_id: int, generate: bool = True):
         """[Activity Condition] Applies the condition that an activity must be right after another activity; start time of activity >= end time of another activity && start time of activity - end time of another activity <= time_max_gap.
@@ -688,8 +893,9 @@ class Solver:
             time_max_gap (int): the maximum time gap between the two activities
             generate (bool): whether to generate or avoid generating the constraint
         """
-        if generate:
-            self.model.Add(self.starts[(client_id, activity_id)] == self.ends[(client_id, other_activity_id)])
+        if not generate:
+            return
+        self.__add(self.starts[(client_id, activity_id)] == self.ends[(client_id, other_activity_id)])
     
     def __apply_between_activities_constraint(self, client_id, activity_id: int, other_activity_id_before: int, other_activity_id_after: int, generate: bool = True):
         """[Activity Condition] Applies the condition that an activity must be between two other activities; start time of activity >= end time of another activity before && end time of activity <= start time of another activity after.
@@ -700,26 +906,26 @@ class Solver:
             other_activity_id_after (int): the id of the other activity after
             generate (bool): whether to generate or avoid generating the constraint
         """
-        if generate:
-            self.model.Add(self.starts[(client_id, activity_id)] >= self.ends[(client_id, other_activity_id_before)])
+        if not generate:
+            return
+        self.__add(self.starts[(client_id, activity_id)] >= self.ends[(client_id, other_activity_id_before)])
 
-            self.model.Add(self.ends[(client_id, activity_id)] <= self.starts[(client_id, other_activity_id_after)])
+        self.__add(self.ends[(client_id, activity_id)] <= self.starts[(client_id, other_activity_id_after)])
     
-    def __apply_between_times_constraint(self, client_id, activity_id: int, time_before: timedelta, time_after: timedelta, generate: bool = True):
+    def __apply_between_times_constraint(self, client_id, activity_id: int, time_before: int, time_after: int, generate: bool = True):
         """[Activity Condition] Applies the condition that an activity must be between two times; start time of activity >= time_before && end time of activity <= time_after.
 
         Args:
             activity_id (int): the id of the activity
-            time_before (int): the minimum time limit for the start of the activity
-            time_after (int): the maximum time limit for the end of the activity
+            time_before (int): the minimum time limit in horizon minutes for the start of the activity
+            time_after (int): the maximum time limit in horizon minutes for the end of the activity
             generate (bool): whether to generate or avoid generating the constraint
         """
-        if generate:
-            time_before = int((time_before - self.__time_start).total_seconds() // 60)
-            time_after = int((time_after - self.__time_start).total_seconds() // 60)
-            self.model.Add(self.starts[(client_id, activity_id)] >= time_before)
-                
-            self.model.Add(self.ends[(client_id, activity_id)] <= time_after)
+        if not generate:
+            return
+        self.__add(self.starts[(client_id, activity_id)] >= time_before)
+
+        self.__add(self.ends[(client_id, activity_id)] <= time_after)
     
     def __apply_between_orders_constraint(self, client_id, activity_id: int, order_before: int, order_after: int, generate: bool = True):
         """[Activity Condition] Applies the condition that an activity must be between two orders; start time of activity >= end time of another activity at order_before && end time of activity <= start time of another activity at order_after.
@@ -734,27 +940,26 @@ class Solver:
             return
         
         if order_after < 0:
-            order_after += len(self.__schedules[client_id])
-            
+            order_after += self.__schedule_lens[client_id]
+
         if order_before < 0:
-            order_before += len(self.__schedules[client_id])
-        
-        self.model.Add(self.orders[(client_id, activity_id)] > order_after)
-        self.model.Add(self.orders[(client_id, activity_id)] < order_before)
+            order_before += self.__schedule_lens[client_id]
+
+        self.model.AddLinearConstraint(self.orders[(client_id, activity_id)], order_after + 1, order_before - 1)
     
-    def __apply_within_after_activity_constraint(self, client_id, activity_id: int, other_activity_id: int, time_after: timedelta, generate: bool = True):
+    def __apply_within_after_activity_constraint(self, client_id, activity_id: int, other_activity_id: int, time_after: int, generate: bool = True):
         """[Activity Condition] Applies the condition that an activity must start within a certain time after another activity; start time of activity >= end time of another activity && start time of activity <= start time of another activity + time_after.
 
         Args:
             activity_id (int): the id of the activity
             other_activity_id (int): the id of the other activity
-            time_after (int): the time limit after the other activity
+            time_after (int): the time limit in minutes after the other activity
             generate (bool): whether to generate or avoid generating the constraint
         """
-        if generate:
-            time_after = int(time_after.total_seconds() // 60)
-            self.model.Add(self.starts[(client_id, activity_id)] >= self.ends[(client_id, other_activity_id)])
-            self.model.Add(self.starts[(client_id, activity_id)] <= self.starts[(client_id, other_activity_id)] + time_after)
+        if not generate:
+            return
+        self.__add(self.starts[(client_id, activity_id)] >= self.ends[(client_id, other_activity_id)])
+        self.__add(self.starts[(client_id, activity_id)] <= self.starts[(client_id, other_activity_id)] + time_after)
     
     def __apply_order_constraint(self, client_id, activity_id: int, order: int, generate: bool = True):
         """[Activity Condition] Applies the condition that an activity must be at a certain order; start time of activity >= end time of other activities at < order && end time of activity <= start time of other activities at > order.
@@ -769,9 +974,9 @@ class Solver:
             return
         
         if order < 0:
-            order += len(self.__schedules[client_id])
+            order += self.__schedule_lens[client_id]
         
-        self.model.Add(self.orders[(client_id, activity_id)] == order)
+        self.__add(self.orders[(client_id, activity_id)] == order)
     
     # Room Conditions
     def __apply_maximum_capacity_constraint(self, room_id: int, activity_id, capacity: int, generate: bool = True):
@@ -782,8 +987,12 @@ class Solver:
             capacity (int): the maximum capacity of the room
             generate (bool): whether to generate or avoid generating the constraint
         """
-        if generate:
-            self.model.Add(sum(self.rooms_per_activity[(activity_id, room_id)]) <= capacity)
+        if not generate:
+            return
+        if capacity == 1:
+            self.model.AddAtMostOne(self.rooms_per_activity[(activity_id, room_id)])
+        else:
+            self.model.AddLinearConstraint(sum(self.rooms_per_activity[(activity_id, room_id)]), 0, capacity)
     
     def __apply_unique_room_for_activity_constraint(self, room_id: int, activity_id: int, generate: bool = True):
         """[Room Condition] Applies the condition that an activity must be in a unique room; sum of activities in room <= 1.
@@ -792,29 +1001,44 @@ class Solver:
             activity_id (int): the id of the activity
             generate (bool): whether to generate or avoid generating the constraint
         """
-        if generate:
-            self.model.AddAtMostOne(self.rooms_per_activity[(activity_id, room_id)])
+        if not generate:
+            return
+        self.model.AddAtMostOne(self.rooms_per_activity[(activity_id, room_id)])
     
-    def __apply_same_room_for_activities_constraint(self, client_id: int, activity_id: int, other_activity_id: int, generate: bool = True):
-        """[Room Condition] Applies the condition that the two activities of client must be in the same room; room id of activity == room id of other activity.
+    def __apply_same_room_for_activity_pairs_constraint(self, client_id: int, activity_id_pairs: List[Tuple[int, int]], generate: bool = True):
+        """[Room Condition] Applies the condition that paired activities of a client must be in the same room; room id of activity == room id of other activity for each pair.
 
         Args:
             client_id (int): the id of the client
-            room_id (int): the id of the room
-            activity_id (int): the id of the activity
-            other_activity_id (int): the id of the other activity
+            activity_id_pairs (list): the (activity id, other activity id) pairs
             generate (bool): whether to generate or avoid generating the constraint
         """
-        if generate:
-            activity_rooms = [(key[2], value) for key, value in self.rooms.items() if key[0] == client_id and key[1] == activity_id]
-            other_activity_rooms = [(key[2], value) for key, value in self.rooms.items() if key[0] == client_id and key[1] == other_activity_id]
-            
-            assert len(activity_rooms) == len(other_activity_rooms), 'Invalid number of rooms for same room constraint'
-            activity_rooms.sort(key=lambda a: a[0])
-            other_activity_rooms.sort(key=lambda a: a[0])
-            
-            for (_, room), (_, other_room) in zip(activity_rooms, other_activity_rooms):
-                self.model.Add(room == other_room)
+        if not generate:
+            return
+        get_room_index_var = self.__get_room_index_var
+        add = self.model.Add
+        for activity_id, other_activity_id in activity_id_pairs:
+            add(get_room_index_var(client_id, activity_id) == get_room_index_var(client_id, other_activity_id))
+
+    def __get_room_index_var(self, client_id: int, activity_id: int) -> IntVar:
+        """Helper function for getting the room index variable of an activity of a client. The variable is channeled to the room literals so that index == i exactly when the i-th candidate room (in room id order) is chosen.
+        """
+        key = (client_id, activity_id)
+        if key in self.__room_index_vars:
+            return self.__room_index_vars[key]
+
+        activity_rooms = sorted(self.rooms_per_client_activity[key], key=lambda a: a[0])
+        assert len(activity_rooms), 'Invalid number of rooms for room index variable'
+
+        if len(activity_rooms) == 1:
+            index = self.model.NewConstant(0)
+        else:
+            index = self.model.NewIntVar(0, len(activity_rooms) - 1, f'room_index_c{client_id}_a{activity_id}')
+            for position, (_, room) in enumerate(activity_rooms):
+                self.model.Add(index == position).OnlyEnforceIf(room)
+
+        self.__room_index_vars[key] = index
+        return index
     
     # Attributes
     @property
@@ -843,10 +1067,10 @@ class Solver:
         
         first_client_arrival_time = datetime.strptime(self.__scenario_action.first_client_arrival_time,"%H:%M")
         self.__time_start = timedelta(hours=first_client_arrival_time.hour, minutes=first_client_arrival_time.minute, seconds=first_client_arrival_time.second)
-        self.__time_end = timedelta(hours=18)
-        self.__time_max_interval = int(timedelta(minutes=5).total_seconds() // 60)
-        self.__time_max_gap = int(timedelta(minutes=self.__scenario_action.max_gap).total_seconds() // 60)
-        self.__time_transfer = int(timedelta(minutes=5).total_seconds() // 60)
+        self.__time_end = TIME_END_OF_DAY
+        self.__time_max_interval = TIME_MAX_INTERVAL_MINUTES
+        self.__time_max_gap = int(self.__scenario_action.max_gap)
+        self.__time_transfer = TIME_TRANSFER_MINUTES
                 
         self.__simultaneous_transfers = self.__scenario_action.allow_simultaneous_transfers
         
@@ -877,11 +1101,11 @@ class Solver:
         self.__rooms_map = collections.defaultdict(list)
         self.__ids_rooms_map = dict()
         for resource in self.__resources:
-            if resource.type == m.ResourceTypes.CLIENT:
-                resource.data['room'] = m.ResourceTypes.CLIENT.value
-            else:
-                resource.data['room'] = resource.room_type.value
-            self.__rooms_map[resource.data['room']].append(resource)
+            room_key = m.ResourceTypes.CLIENT.value if resource.type == m.ResourceTypes.CLIENT else resource.room_type.value
+            # The data entry stays because the resource is serialized into
+            # the generated scenario
+            resource.data['room'] = room_key
+            self.__rooms_map[room_key].append(resource)
             self.__ids_rooms_map[resource.resource_id] = resource
         
     @property
@@ -911,15 +1135,18 @@ class Solver:
                 for activity, time_allocations in zip(_activities, _time_allocations)
             ]
             
-            self.__activities_names_map = collections.defaultdict(list)
-            for activity in self.__activities:
-                for time_allocation in activity.time_allocations.__dict__:
-                    self.__activities_names_map[(activity.activity_id, time_allocation)].append({
-                        'id': activity.activity_id,
-                        'room_type': activity.room_type,
-                        'resource_type': activity.resource_type,
-                        'duration': getattr(activity.time_allocations, time_allocation)
-                    })
+            # Each (activity, allocation) key occurs exactly once, so the
+            # entries are stored directly instead of as one-element lists
+            self.__activities_names_map = {
+                (activity.activity_id, time_allocation): {
+                    'id': activity.activity_id,
+                    'room_type': activity.room_type,
+                    'resource_type': activity.resource_type,
+                    'duration': getattr(activity.time_allocations, time_allocation)
+                }
+                for activity in self.__activities
+                for time_allocation in TIME_ALLOCATION_FIELDS
+            }
         else:
             self.__activities = _activities
     
@@ -970,8 +1197,12 @@ class Solver:
         """Setter attribute for the assessments
         """
         assert len(_assessments), 'Invalid assessments'
-        
-        _assessment_names = sorted(list(_assessments.keys()), key=self.__get_assessment_priority)
+
+        # Normalize the keys once so the priority sort and the per-assessment
+        # lookups can rely on uppercase names
+        _assessments = {name.upper(): assessment for name, assessment in _assessments.items()}
+
+        _assessment_names = sorted(_assessments, key=self.__get_assessment_priority)
 
         self.__assessments = {
             _assessment_name: _assessments[_assessment_name]
@@ -1004,13 +1235,13 @@ class Solver:
     def room_conditions(self) -> List[sm.Condition]:
         """Getter attribute for the room conditions
         """
-        return self.__activities
-    
+        return self.__room_conditions
+
     @room_conditions.setter
     def room_conditions(self, _room_conditions: List[dict]) -> None:
         """Setter attribute for the room conditions
         """
-        self.__assessments = [
+        self.__room_conditions = [
             sm.Condition(
                 **room_condition
             )
@@ -1020,19 +1251,83 @@ class Solver:
     # Main scenario generating function
     def generate(self):
         assert self.__assessments is not None, 'Invalid assessments'
-        
-        self.__initialize_variables()
-        self.__define_variables()
-        self.__apply_general_constraints()
-        self.__apply_activity_constraints()
-        # self.__apply_room_constraints()
-        self.__define_objective()
-        
+
+        if not self.__model_built:
+            self.__initialize_variables()
+            self.__compute_activity_uids()
+            self.__define_variables()
+            self.__apply_general_constraints()
+            self.__apply_activity_constraints()
+            # self.__apply_room_constraints()
+            self.__define_objective(self.__solver_mode)
+
+            # Optional fixed search over the start variables for pathological
+            # instances; off by default since portfolio search usually wins
+            if os.getenv('SOLVER_FIXED_SEARCH'):
+                self.model.AddDecisionStrategy(
+                    [self.starts[key] for key in sorted(self.starts)],
+                    cp_model.CHOOSE_LOWEST_MIN,
+                    cp_model.SELECT_MIN_VALUE,
+                )
+
+            self.__model_built = True
+
+        # Dump the model so representative instances can be tuned offline
+        export_file = os.getenv('SOLVER_EXPORT_MODEL_FILE')
+        if export_file:
+            self.model.ExportToFile(export_file)
+
         self.__solver = cp_model.CpSolver()
-        self.__solver.parameters.max_time_in_seconds = timedelta(minutes=int(os.getenv('SOLVER_MAX_TIME_MINUTES', 3))).total_seconds()
+        self.__solver.parameters.max_time_in_seconds = SOLVER_MAX_TIME_SECONDS
+        self.__solver.parameters.num_search_workers = SOLVER_NUM_WORKERS
+        self.__solver.parameters.log_search_progress = False
+        if os.getenv('SOLVER_FIXED_SEARCH'):
+            self.__solver.parameters.search_branching = cp_model.FIXED_SEARCH
+
+        # Offline-tuned CP-SAT parameters, e.g. '{"cp_model_probing_level": 1}'
+        parameter_overrides = os.getenv('SOLVER_PARAMETERS')
+        if parameter_overrides:
+            for parameter, value in json.loads(parameter_overrides).items():
+                setattr(self.__solver.parameters, parameter, value)
         
+        # Optional two-phase solve: a short probe seeds start hints so the
+        # main solve begins from a known feasible schedule
+        warm_start_seconds = float(os.getenv('SOLVER_WARM_START_SECONDS', 0))
+        if warm_start_seconds > 0:
+            probe = cp_model.CpSolver()
+            probe.parameters.CopyFrom(self.__solver.parameters)
+            probe.parameters.max_time_in_seconds = warm_start_seconds
+            probe_status = probe.Solve(self.model)
+            if probe_status == cp_model.OPTIMAL or probe_status == cp_model.FEASIBLE:
+                probe_solution = probe.ResponseProto().solution
+                self.model.ClearHints()
+                for start in self.starts.values():
+                    self.model.AddHint(start, probe_solution[start.Index()])
+
         start_time = datetime.now()
-        self.__status = self.__solver.Solve(self.model)
+        portfolio_size = int(os.getenv('SOLVER_PORTFOLIO_SIZE', 1))
+        if portfolio_size > 1:
+            # Race the same model under different seeds to diversify the
+            # search; CP-SAT releases the GIL so the solves run in parallel
+            solvers = []
+            for seed in range(portfolio_size):
+                solver = cp_model.CpSolver()
+                solver.parameters.CopyFrom(self.__solver.parameters)
+                solver.parameters.random_seed = seed
+                solvers.append(solver)
+            with concurrent.futures.ThreadPoolExecutor(max_workers=portfolio_size) as executor:
+                statuses = list(executor.map(lambda solver: solver.Solve(self.model), solvers))
+            solved = [
+                (solver.ObjectiveValue(), solver, status)
+                for solver, status in zip(solvers, statuses)
+                if status == cp_model.OPTIMAL or status == cp_model.FEASIBLE
+            ]
+            if solved:
+                _, self.__solver, self.__status = min(solved, key=lambda result: result[0])
+            else:
+                self.__status = statuses[0]
+        else:
+            self.__status = self.__solver.Solve(self.model)
         end_time = datetime.now()
         
         print(self.__solver.StatusName(self.__status))
@@ -1042,85 +1337,78 @@ class Solver:
         if self.__status != cp_model.OPTIMAL and self.__status != cp_model.FEASIBLE:
             raise ValueError('Cannot generate schedule')
         
-        self.__generated_scenarios = []
-        
+        # Preallocated so each client scenario is written straight to its slot
+        self.__generated_scenarios = [None] * len(self.__schedules)
+
+        # One bulk copy of the solution; per-variable Value() calls cross the
+        # SWIG boundary once per call while this is indexed by var.Index()
+        solution = self.__solver.ResponseProto().solution
+
+        # Flatten the transfer lookups to solution indexes so the per-client
+        # filter below runs over plain ints
+        transfer_indexes_per_client = {
+            client_id: [
+                (
+                    self.transfer_precedences[key].Index(),
+                    self.transfer_floors[key].Index(),
+                    self.transfer_starts[key].Index(),
+                )
+                for key in keys
+            ]
+            for client_id, keys in self.transfers_per_client.items()
+        }
+
+        # Locals for the extraction loop; the repeated self lookups are
+        # pure overhead across clients x activities
+        starts_per_client = self.starts_per_client
+        rooms_per_client_activity = self.rooms_per_client_activity
+        ids_rooms_map = self.__ids_rooms_map
+        uid_room_types_map = self.__uid_room_types_map
+        scenario_activity_builders = self.__scenario_activity_builders
+        time_max_interval = self.__time_max_interval
+
         for client_id, _ in enumerate(self.__schedules):
-            client_scenario: m.ClientScenario = self.__clients_scenarios_map[client_id]
-            activities = [(key[1], self.__solver.Value(value)) for key, value in self.starts.items() if key[0] == client_id]
-            activities.sort(key=lambda activity: activity[1])
-            
+            client_scenario: m.ClientScenario = self.__clients_scenarios[client_id]
+            activities = [(activity_uid, solution[start.Index()]) for activity_uid, start in starts_per_client[client_id]]
+            activities.sort(key=itemgetter(1))
+
+            # Built locally and assigned once; appending through the
+            # scenario attribute costs a lookup per activity
+            scenario_activities = []
+
             for activity_id, start in activities:
-                room_id = set([key[2] for key, value in self.rooms.items() if key[0] == client_id and key[1] == activity_id and self.__solver.Value(value)]).pop()
-                
-                room: m.Resource = self.__ids_rooms_map[room_id]
-                for activity_uid in self.__uids_activities_map[activity_id]:
-                    activity: m.Activity = self.__ids_activities_map[activity_uid]
-                                        
-                    if activity.room_type == room.room_type.value:
-                        break
+                room_id = next(room_id for room_id, value in rooms_per_client_activity[(client_id, activity_id)] if solution[value.Index()])
+
+                room: m.Resource = ids_rooms_map[room_id]
+                activity: m.Activity = uid_room_types_map.get((activity_id, room.room_type.value))
+                if activity is None:
+                    # No variant declares this room type; keep the last
+                    # variant like the old scan did when nothing matched
+                    activity = self.__ids_activities_map[self.__uids_activities_map[activity_id][-1]]
                 
-                client_scenario.activities.append(m.ScenarioActivity(
-                    **activity.__dict__,
-                    movable=False,
+                scenario_activities.append(scenario_activity_builders[activity.activity_id](
                     assigned_room=room,
-                    assigned_time=int(start // 5),
+                    assigned_time=start // time_max_interval,
                     conditions=[]
                 ))
                 
-            for key, value in self.transfer_starts.items():
-                if self.__solver.Value(self.transfer_precedences[key]) and self.__solver.Value(self.transfer_floors[key]) and key[0] == client_id:
-                    transfer_start = self.__solver.Value(value)
-                    client_scenario.activities.append(m.TransferActivity(
+            for precedence_index, floor_index, start_index in transfer_indexes_per_client.get(client_id, ()):
+                if solution[precedence_index] and solution[floor_index]:
+                    transfer_start = solution[start_index]
+                    scenario_activities.append(m.TransferActivity(
                         activity_name='Transfer',
                         time_allocations=m.TimeAllocation(default_time=5),
                         movable=False,
-                        assigned_time=int(transfer_start // 5),
+                        assigned_time=transfer_start // time_max_interval,
                         conditions=[]
                     ))
             
-            client_scenario.activities.sort(key=lambda activity: activity.assigned_time)
-            self.__generated_scenarios.append(client_scenario.to_json())
+            scenario_activities.sort(key=attrgetter('assigned_time'))
+            client_scenario.activities = scenario_activities
+            self.__generated_scenarios[client_id] = client_scenario.to_json()
         
         return self.__generated_scenarios
     
     # Helper Methods
-    def __get_client_type(self, client_id: int) -> m.ClientType:
-        num_clients_optimal = self.assessments[m.ClientType.OPTIMAL.value].data['num_clients']
-        num_clients_ultimate = self.assessments[m.ClientType.ULTIMATE.value].data['num_clients']
-        num_clients_core = self.assessments[m.ClientType.CORE.value].data['num_clients']
-
-        if client_id in range(0, num_clients_optimal):
-            return m.ClientType.OPTIMAL
-        elif client_id in range(num_clients_optimal, num_clients_optimal + num_clients_ultimate):
-            return m.ClientType.ULTIMATE
-        elif client_id in range(num_clients_optimal + num_clients_ultimate, num_clients_optimal + num_clients_ultimate + num_clients_core):
-            return m.ClientType.CORE
-
-    def __get_client_sex_by_client_type_and_id(self, client_id: int) -> m.ClientSex:
-        num_clients_optimal = self.assessments[m.ClientType.OPTIMAL.value].data['num_clients']
-        num_clients_ultimate = self.assessments[m.ClientType.ULTIMATE.value].data['num_clients']
-        num_clients_core = self.assessments[m.ClientType.CORE.value].data['num_clients']
-
-        num_male_clients_optimal = self.assessments[m.ClientType.OPTIMAL.value].data['num_male_clients']
-        num_male_clients_ultimate = self.assessments[m.ClientType.ULTIMATE.value].data['num_male_clients']
-        num_male_clients_core = self.assessments[m.ClientType.CORE.value].data['num_male_clients']
-        
-        if client_id in range(0, num_clients_optimal):
-            if client_id in range(0, num_male_clients_optimal):
-                return m.ClientSex.MALE
-        elif client_id in range(num_clients_optimal, num_clients_optimal + num_clients_ultimate):
-            if client_id in range(num_clients_optimal, num_clients_optimal + num_male_clients_ultimate):
-                return m.ClientSex.MALE
-        elif client_id in range(num_clients_optimal + num_clients_ultimate, num_clients_optimal + num_clients_ultimate + num_clients_core):
-            if client_id in range(num_clients_optimal, num_clients_optimal + num_clients_ultimate + num_male_clients_core):
-                return m.ClientSex.MALE
-        return m.ClientSex.FEMALE
-    
     def __get_assessment_priority(self, assessment_name: str) -> int:
-        assessment_name = assessment_name.upper()
-        if assessment_name == m.ClientType.OPTIMAL.value:
-            return 0
-        elif assessment_name == m.ClientType.ULTIMATE.value:
-            return 1
-        elif assessment_name == m.ClientType.CORE.value:
-            return 2
\ No newline at end of file
+        return ASSESSMENT_PRIORITIES.get(assessment_name.upper(), len(ASSESSMENT_PRIORITIES))
\ No newline at end of file